@@ -5,6 +5,8 @@ from humble_gift_matcher.config_data import ConfigData
 from humble_gift_matcher.configuration import Configuration
 from humble_gift_matcher.humble_api.humble_api import HumbleApi
 from humble_gift_matcher.actions import Action
+from humble_gift_matcher.response_cache import ResponseCache, ResponseCacheMiss
+from humble_gift_matcher.checkpoint import Checkpoint
 from steam import webauth
 
 
@@ -47,7 +49,17 @@ if not validation_status:
     exit("Invalid configuration.  Please check your command line arguments and "
          "hb-downloader-settings.yaml.")
     
-hapi = HumbleApi(ConfigData.auth_sess_cookie)
+cache = ResponseCache(ConfigData.cache_dir, ConfigData.cache_max_mb * 1024 * 1024,
+                      ConfigData.cache_ttl, ConfigData.cache_mode)
+
+if ConfigData.action == "build-index":
+    try:
+        Action.build_app_index(cache)
+    except ResponseCacheMiss as e:
+        exit("%s.  The Steam app list isn't cached; run without --cache-only first." % e)
+    exit()
+
+hapi = HumbleApi(ConfigData.auth_sess_cookie, cache)
 
 if not hapi.check_login():
         exit("Login to humblebundle.com failed."
@@ -57,6 +69,11 @@ password = input("Enter Steam password: ") if ConfigData.steam_password == "" el
 user = webauth.WebAuth2()
 steam_session = user.login(ConfigData.steam_username, password)
 
-Action.match_games_with_friends(hapi, steam_session)
+checkpoint = Checkpoint(os.path.join(ConfigData.cache_dir, ConfigData.checkpoint_dirname), ConfigData.resume)
+try:
+    Action.match_games_with_friends(hapi, steam_session, cache, checkpoint)
+except ResponseCacheMiss as e:
+    exit("%s.  Orders, friends and the Steam app list must all be cached to use --cache-only; "
+         "run without it first." % e)
 
 exit()
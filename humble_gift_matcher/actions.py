@@ -1,46 +1,162 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import itertools
+import os
+import time
 from humble_gift_matcher.config_data import ConfigData
 from alive_progress import alive_bar
-from .steam_api.steam_api import get_appids, get_friends_with_details, get_wishlist
+from .steam_api.steam_api import fetch_wishlists, get_app_prices, get_appids, get_friends_with_details
+from .steam_api.rate_controller import AdaptiveRateController
+from .steam_api.app_index import AppIndex
+from .steam_api.model.friend import Friend
+from .humble_api.model.game_record import GameRecord
+from .matching import appid_array, match_wishlists
+from .response_cache import ResponseCache
 
 
 class Action:
     @staticmethod
-    def match_games_with_friends(hapi, steam_session):
+    def build_app_index(cache=None):
         print("[Info] Fetching all Steam appids.")
-        appid_list = get_appids()
+        appid_list = get_appids(cache)
         print(f"[Info] Found {len(appid_list)} apps")
-        appid_lookup = dict([(app["name"], app["appid"]) for app in appid_list])
+        path = Action.app_index_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        AppIndex.build(appid_list, path)
+        print(f"[Info] Wrote Steam app index to {path}")
 
-        games = hapi.get_orders_with_details(appid_lookup)
-        unredeemed_wishlisted = dict([(game.steam_app_id, 0) for game in games if not game.claimed])
+    @staticmethod
+    def app_index_path():
+        return os.path.join(os.path.expanduser(ConfigData.cache_dir), ConfigData.app_index_filename)
+
+    @staticmethod
+    def load_app_index(cache=None):
+        path = Action.app_index_path()
+        max_age = ResponseCache.DEFAULT_TTLS["appids"] if cache is None else cache.ttls["appids"]
+        if not os.path.isfile(path) or time.time() - os.path.getmtime(path) > max_age:
+            Action.build_app_index(cache)
+        try:
+            return AppIndex(path)
+        except ValueError:
+            # Left over from an older version with a different file format.
+            Action.build_app_index(cache)
+            return AppIndex(path)
+
+    @staticmethod
+    def load_games(hapi, cache=None, checkpoint=None):
+        saved = None if checkpoint is None else checkpoint.load("games")
+        if saved is not None:
+            print(f"[Info] Resuming with {len(saved)} unredeemed games from the last run.")
+            return [GameRecord(*game) for game in saved]
+
+        app_index = Action.load_app_index(cache)
+        print(f"[Info] Loaded {len(app_index)} Steam app names")
+        games = hapi.get_orders_with_details(app_index)
+        if checkpoint is not None:
+            checkpoint.save("games", [[game.name, game.steam_app_id, game.parent] for game in games])
+        return games
+
+    @staticmethod
+    def load_friends(cache=None, checkpoint=None):
+        saved = None if checkpoint is None else checkpoint.load("friends")
+        if saved is not None:
+            return dict([(friend["steamid"], Friend(friend)) for friend in saved])
+
+        friends = get_friends_with_details(ConfigData.steam_api_key, ConfigData.steam_user_id, cache=cache)
+        if checkpoint is not None:
+            checkpoint.save("friends", [friend._data for friend in friends.values()])
+        return friends
+
+    @staticmethod
+    def rank_gifts(appids, types, prices):
+        """
+            Drops apps whose store type isn't one of the configured gift types, then orders the rest by price,
+            most valuable first. Apps of unknown type are kept, and apps without a price come last.
+
+            :param appids: The matched appids.
+            :param types: The store type of each app, as listed on the wishlists, keyed by appid.
+            :param prices: The price_overview of the matched apps, keyed by appid.
+            :return: The ranked appids.
+        """
+        gift_types = [gift_type.lower() for gift_type in ConfigData.gift_types]
+        gifts = [appid for appid in appids if types.get(appid) is None or types[appid].lower() in gift_types]
+        return sorted(gifts, key=lambda appid: -prices[appid].get("final", 0) if appid in prices else 1)
+
+    @staticmethod
+    def describe_price(price_overview):
+        if price_overview is None or price_overview.get("final_formatted") is None:
+            return ""
+        return f" ({price_overview['final_formatted']})"
+
+    @staticmethod
+    def match_games_with_friends(hapi, steam_session, cache=None, checkpoint=None):
+        games = Action.load_games(hapi, cache, checkpoint)
         game_lookup = {game.steam_app_id: game for game in games}
-        print(f"[INFO] {len(unredeemed_wishlisted)} of {len(games)} unredeemed.")
+        available = appid_array(game_lookup)
+        print(f"[INFO] {len(available)} unredeemed games matched to Steam appids.")
 
-        friends_api_response = get_friends_with_details(ConfigData.steam_api_key, ConfigData.steam_user_id)
-        keys_by_friend = {steamid: [] for steamid in friends_api_response}
+        controller = AdaptiveRateController(initial=ConfigData.steam_store_workers,
+                                            maximum=ConfigData.steam_max_in_flight)
+        friends_api_response = Action.load_friends(cache, checkpoint)
+        # Wishlists are checkpointed as [appid, type] pairs, the type being what filters out DLC and the like later
+        # on. Checkpoints from before the type was kept hold bare appids, whose type is then unknown.
+        saved = {} if checkpoint is None else checkpoint.load_units("wishlists")
+        saved = dict([(steamid, [entry if type(entry) is list else [entry, None] for entry in entries])
+                      for steamid, entries in saved.items()])
+        wishlists = dict([(steamid, [appid for appid, _ in entries]) for steamid, entries in saved.items()])
+        types = dict(itertools.chain.from_iterable(saved.values()))
+        if wishlists:
+            print(f"[Info] Resuming with {len(wishlists)} wishlists from the last run.")
+        missing = [steamid for steamid in friends_api_response if steamid not in wishlists]
+        unavailable = set()
         with alive_bar(len(friends_api_response)) as bar:
-            bar.title("[Info] Matching friends with games.")
-            for steamid in friends_api_response:
-                wishlist = get_wishlist(steamid, steam_session)
-                for appid in wishlist.keys():
-                    if appid in unredeemed_wishlisted:
-                        keys_by_friend[steamid].append(appid)
-                        unredeemed_wishlisted[appid] += 1
+            bar.title("[Info] Fetching friends' wishlists.")
+            bar(len(friends_api_response) - len(missing))
+            for steamid, wishlist in fetch_wishlists(missing, steam_session, cache, controller):
+                if wishlist is None:
+                    unavailable.add(steamid)
+                else:
+                    entries = [[appid, game.type] for appid, game in wishlist.items()]
+                    wishlists[steamid] = [appid for appid, _ in entries]
+                    types.update(entries)
+                    if checkpoint is not None:
+                        checkpoint.save_unit("wishlists", steamid, entries)
                 bar()
+        if unavailable:
+            print(f"[WARN] {len(unavailable)} wishlists could not be fetched; they are marked unavailable below. "
+                  f"Run again with --resume to fetch just those.")
+        keys_by_friend, wishers = match_wishlists(available, wishlists)
 
+        _, wishlist = next(fetch_wishlists([ConfigData.steam_user_id], steam_session, cache, controller))
+        own_matches, _ = match_wishlists(available, {ConfigData.steam_user_id: (wishlist or {}).keys()})
+        types.update([(appid, game.type) for appid, game in (wishlist or {}).items()])
+
+        # Only matched appids are priced, so the number of store lookups is bounded by the matches, not the library.
+        matched = set(itertools.chain(own_matches[ConfigData.steam_user_id], *keys_by_friend.values()))
+        print(f"[Info] Fetching prices for {len(matched)} matched apps.")
+        prices = get_app_prices(matched, cache, ConfigData.steam_max_in_flight, controller=controller)
 
         print("\nResults:")
         for steamid, friend in friends_api_response.items():
-            matches = keys_by_friend[steamid]
+            if steamid in unavailable:
+                print(f"\n{friend.name} ({friend.real_name}): (wishlist unavailable)")
+                continue
+            matches = Action.rank_gifts(keys_by_friend[steamid], types, prices)
             print(f"\n{friend.name} ({friend.real_name}) would like {len(matches)} of your available games:")
             for appid in matches:
                 game = game_lookup[appid]
-                print(f"{game.name} from {game.parent}. Wanted by {unredeemed_wishlisted[appid] - 1} others.")
+                print(f"{game.name} from {game.parent}{Action.describe_price(prices.get(appid))}. "
+                      f"Wanted by {wishers[appid] - 1} others.")
 
         print(f"\nYou!")
-        wishlist = get_wishlist(ConfigData.steam_user_id, steam_session)
-        for appid in wishlist.keys():
-            if appid in unredeemed_wishlisted:
-                print(f"{game_lookup[appid].name}")
\ No newline at end of file
+        if wishlist is None:
+            print("(wishlist unavailable)")
+        for appid in Action.rank_gifts(own_matches[ConfigData.steam_user_id], types, prices):
+            print(f"{game_lookup[appid].name}")
+
+        if cache is not None:
+            print(f"\n[Info] Response cache: {cache.summary()}")
+        print(f"[Info] Steam request rates: {controller.summary()}")
+        # Keep the checkpoints when wishlists are missing so --resume can fill them in.
+        if checkpoint is not None and not unavailable:
+            checkpoint.clear()
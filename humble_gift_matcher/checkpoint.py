@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import json
+import os
+from typing import Any, Dict
+
+
+class Checkpoint(object):
+    """
+        Persists the results of each stage of a run so an interrupted run can pick up where it left off.
+
+        Whole stages (such as the resolved games list) are saved as one JSON file each, written atomically. Stages made
+        of many small units (such as one wishlist per friend) are appended to a JSON lines file as each unit
+        completes, so at most the unit in flight is lost.
+    """
+
+    def __init__(self, directory: str, resume: bool = False):
+        """
+            Parameterized constructor for the Checkpoint object.
+
+            :param directory: The directory checkpoints are stored in. Created if it doesn't exist.
+            :param resume: If False, any checkpoints left by a previous run are discarded.
+        """
+        self.directory = os.path.expanduser(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        if not resume:
+            self.clear()
+
+    def load(self, stage: str) -> Any:
+        """
+            Loads a completed stage.
+
+            :param stage: The name of the stage.
+            :return: The saved data, or None if the stage hasn't completed.
+        """
+        try:
+            with open(self._path(stage, ".json"), "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            return None
+
+    def save(self, stage: str, data: Any):
+        """
+            Marks a stage as completed.
+
+            :param stage: The name of the stage.
+            :param data: The JSON serializable result of the stage.
+            :return: None
+        """
+        path = self._path(stage, ".json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(data, f)
+        os.replace(path + ".tmp", path)
+
+    def load_units(self, stage: str) -> Dict[str, Any]:
+        """
+            Loads the completed units of a stage. A partially written last line is ignored.
+
+            :param stage: The name of the stage.
+            :return: The saved data of each completed unit, keyed by unit.
+        """
+        units = {}
+        try:
+            with open(self._path(stage, ".jsonl"), "r") as f:
+                for line in f:
+                    try:
+                        unit, data = json.loads(line)
+                    except (json.decoder.JSONDecodeError, ValueError):
+                        continue
+                    units[unit] = data
+        except FileNotFoundError:
+            pass
+        return units
+
+    def save_unit(self, stage: str, unit: str, data: Any):
+        """
+            Marks one unit of a stage as completed.
+
+            :param stage: The name of the stage.
+            :param unit: The key of the unit.
+            :param data: The JSON serializable result of the unit.
+            :return: None
+        """
+        with open(self._path(stage, ".jsonl"), "a+b") as f:
+            line = json.dumps([unit, data]).encode("utf-8") + b"\n"
+            # Start on a fresh line if a previous run died part way through writing one.
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
+            f.flush()
+
+    def clear(self):
+        """
+            Discards all checkpoints.
+
+            :return: None
+        """
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith((".json", ".jsonl", ".tmp")):
+                os.remove(entry.path)
+
+    def _path(self, stage: str, suffix: str) -> str:
+        return os.path.join(self.directory, stage + suffix)
@@ -13,3 +13,13 @@ class ConfigData(object):
     steam_user_id = 0
     steam_username = ""
     steam_password = ""
+    cache_dir = "~/.cache/humble-gift-matcher"
+    cache_max_mb = 256
+    cache_ttl = {}
+    cache_mode = "normal"
+    app_index_filename = "steam-app-index.bin"
+    gift_types = ["game"]
+    steam_store_workers = 4
+    steam_max_in_flight = 16
+    checkpoint_dirname = "checkpoint"
+    resume = False
@@ -34,6 +34,12 @@ class Configuration(object):
         ConfigData.steam_user_id = saved_config.get("steam-user-id", ConfigData.steam_user_id)
         ConfigData.steam_username = saved_config.get("steam-username", ConfigData.steam_username)
         ConfigData.steam_password = saved_config.get("steam-password-optional", ConfigData.steam_password)
+        ConfigData.cache_dir = saved_config.get("cache-dir", ConfigData.cache_dir)
+        ConfigData.cache_max_mb = saved_config.get("cache-max-mb", ConfigData.cache_max_mb)
+        ConfigData.cache_ttl = saved_config.get("cache-ttl", ConfigData.cache_ttl)
+        ConfigData.gift_types = saved_config.get("gift-types", ConfigData.gift_types)
+        ConfigData.steam_store_workers = saved_config.get("steam-store-workers", ConfigData.steam_store_workers)
+        ConfigData.steam_max_in_flight = saved_config.get("steam-max-in-flight", ConfigData.steam_max_in_flight)
 
     @staticmethod
     def parse_command_line():
@@ -52,6 +58,18 @@ class Configuration(object):
                 "-c", "--auth_cookie",
                 default=ConfigData.auth_sess_cookie, type=str,
                 help="The _simple_auth cookie value from a web browser")
+        cache_mode = parser.add_mutually_exclusive_group()
+        cache_mode.add_argument(
+                "--no-cache", dest="cache_mode", action="store_const", const="no-cache",
+                help="Ignore the response cache and always query the APIs.")
+        cache_mode.add_argument(
+                "--cache-only", dest="cache_mode", action="store_const", const="cache-only",
+                help=("Serve cacheable endpoints only from the cache instead of querying the APIs. "
+                      "Uncached wishlists are reported as unavailable and uncached prices left out; any other "
+                      "miss stops the run."))
+        parser.add_argument(
+                "--resume", action="store_true", default=ConfigData.resume,
+                help="Continue an interrupted run from its last completed stage.")
 
         sub = parser.add_subparsers(
                 title="action", dest="action",
@@ -64,12 +82,18 @@ class Configuration(object):
         a_list = sub.add_parser("match", help=(
                 "Match unredeemed games with friend's wishlists."))
 
+        a_build_index = sub.add_parser("build-index", help=(
+                "Download the Steam app list and rebuild the app name index."))
+
         args = parser.parse_args()
 
         Configuration.configure_action(args)
 
         ConfigData.debug = args.debug
         ConfigData.auth_sess_cookie = args.auth_cookie
+        ConfigData.resume = args.resume
+        if args.cache_mode is not None:
+            ConfigData.cache_mode = args.cache_mode
 
     @staticmethod
     def configure_action(args):
@@ -3,15 +3,15 @@
 from alive_progress import alive_bar
 import http.cookiejar
 import itertools
-from typing import Dict, List
+from typing import Iterator, List, Tuple
 from rapidfuzz import process, fuzz
-from .model.game import Game
-from .model.product import Product
+from .model.game_record import GameRecord
 import json
 import requests
 from .exceptions.humble_response_exception import HumbleResponseException
 from .exceptions.humble_parse_exception import HumbleParseException
 from .exceptions.humble_authentication_exception import HumbleAuthenticationException
+from ..response_cache import ResponseCache
 
 
 class HumbleApi(object):
@@ -43,14 +43,18 @@ class HumbleApi(object):
     # request sent to humblebundle.com.
     default_params = {"ajax": "true"}
 
-    def __init__(self, auth_sess_cookie):
+    def __init__(self, auth_sess_cookie, cache: ResponseCache = None):
         """
             Base constructor.  Responsible for setting up the requests object
             and cookie jar. All configuration values should be set prior to
             constructing an object of this type; changes to configuration will
             not take effect on variables which already exist.
+
+            :param auth_sess_cookie: The _simpleauth_sess cookie value.
+            :param cache: (optional) The response cache to serve GET requests from.
         """
         self.session = requests.Session()
+        self.cache = cache
 
         auth_sess_cookie = bytes(
                 auth_sess_cookie, "utf-8").decode("unicode_escape")
@@ -111,22 +115,25 @@ class HumbleApi(object):
         # We didn't get a list, or an error message
         raise HumbleResponseException("Unexpected response body", request=response.request, response=response)
         
-    def get_orders_with_details(self, appid_lookup: Dict[str, str], *args, **kwargs):
+    def get_orders_with_details(self, app_index, *args, **kwargs):
         """
-            Fetch all the gamekeys owned by an account.
+            Fetch all the unredeemed game keys owned by an account, resolved to Steam appids where possible.
 
-            A gamekey is a string that uniquely identifies an order from the Humble store.
+            Orders are fetched and resolved a chunk at a time, so claimed keys and raw order JSON are never held for
+            the whole account.
 
+            :param app_index: Resolves Steam app names to appids. Must provide get(name, default) and a names
+             sequence of every app name for the fuzzy matcher, such as an AppIndex.
             :param list args: (optional) Extra positional args to pass to the request
             :param dict kwargs: (optional) Extra keyword args to pass to the request
-            :return: A list of gamekeys
+            :return: A list of unredeemed games
             :rtype: list
             :raises RequestException: if the connection failed
             :raises HumbleAuthenticationException: if not logged in
             :raises HumbleResponseException: if the response was invalid
         """
         print("[Info] Fetching order list.")
-        response = self._request("GET", HumbleApi.ORDER_LIST_URL, *args, **kwargs)
+        response = self._request("GET", HumbleApi.ORDER_LIST_URL, *args, endpoint="order_list", **kwargs)
 
         """ get_gamekeys response always returns JSON """
         data = self.__parse_data(response)
@@ -140,29 +147,7 @@ class HumbleApi(object):
 
         keys = [v["gamekey"] for v in data]
         print(f"[Info] {len(keys)} orders found.")
-        paginated_keys = [keys[i:i+25] for i in range(0, len(keys), 25)]
 
-        orders_json = {}
-        with alive_bar(len(keys)) as bar:
-            bar.title("[Info] Fetching order details")
-            for keys_chunk in paginated_keys:
-                payload = {"all_tpkds": "true", "gamekeys": keys_chunk}
-                response_with_details = self._request("GET", HumbleApi.ORDERS_URL, params=payload)
-                data_chunk = self.__parse_data(response_with_details)
-                orders_json.update(data_chunk)
-                bar(len(keys_chunk))
-        
-        games: List[Game] = []
-        with alive_bar(len(keys)) as bar:
-            bar.title("[Info] Parsing games from orders")
-            for order in orders_json.values():
-                product = Product(order["product"])
-                tpks = order["tpkd_dict"]["all_tpks"]
-                bar.text(f"{product.human_name}: {len(tpks)} keys")
-                for game in tpks:
-                    games.append(Game(game, product.human_name))
-        print(f"[INFO] Found {len(games)}")
-        
         try:
             with open('humble_steam_matches.json', 'r') as f:
                 previous_run_matches = json.load(f)
@@ -171,23 +156,26 @@ class HumbleApi(object):
             print("[WARN] No record of matches from previous runs found.")
             previous_run_matches = {}
 
+        games: List[GameRecord] = []
         unmatched_games = []
-        with alive_bar(len(games)) as bar:
-            bar.title("[Info] Matching Humble games with Steam appids.")
-            for game in games:
-                bar.text(game.name)
-                if game.steam_app_id is None:
-                    appid = appid_lookup.get(game.name, None)
-                    if appid is None:
-                        appid = previous_run_matches.get(game.name, None)
+        with alive_bar(len(keys)) as bar:
+            bar.title("[Info] Fetching orders and matching Humble games with Steam appids.")
+            for keys_chunk, chunk_games in self.iter_unclaimed_games(keys):
+                for game in chunk_games:
+                    if game.steam_app_id is None:
+                        appid = app_index.get(game.name, None)
                         if appid is None:
-                            unmatched_games.append(game)
-                    game.steam_app_id = appid
-                bar()
+                            appid = previous_run_matches.get(game.name, None)
+                            if appid is None:
+                                unmatched_games.append(game)
+                        game.steam_app_id = appid
+                    games.append(game)
+                bar(len(keys_chunk))
+        print(f"[INFO] Found {len(games)} unredeemed keys")
 
         if unmatched_games:
             print(f"[Info] {len(unmatched_games)} games still have no appid. Attempting fuzzy match")
-            name_list = appid_lookup.keys()
+            name_list = app_index.names
             for game in unmatched_games:
                 match_options = [title for (title, _, _) in process.extract(game.name, name_list, scorer=fuzz.WRatio, limit=10)]
                 print(f"\nWhich number is the correct match for: {game.name}")
@@ -206,7 +194,7 @@ class HumbleApi(object):
 
                 try:
                     steam_name = match_options[int(response) - 1]
-                    game.steam_app_id = appid_lookup.get(steam_name) 
+                    game.steam_app_id = app_index.get(steam_name)
                     previous_run_matches[game.name] = game.steam_app_id
                 except:
                     print(f"[WARN] {game.name} remains unmatched")
@@ -217,16 +205,67 @@ class HumbleApi(object):
 
         return games
 
+    def iter_unclaimed_games(self, keys: List[str], chunk_size: int = 25) -> Iterator[Tuple[List[str], List[GameRecord]]]:
+        """
+            Fetch order details a chunk of gamekeys at a time and yield the unclaimed game keys in each chunk.
+
+            Only the current chunk's JSON is alive at any point; claimed keys are dropped before anything is yielded.
 
-    def _request(self, *args, **kwargs):
+            :param keys: The gamekeys of the orders to fetch.
+            :param chunk_size: (optional) The number of orders fetched per request.
+            :return: An iterator of (gamekeys in the chunk, unclaimed games in the chunk) tuples.
+            :raises RequestException: if the connection failed
+            :raises HumbleParseException: if a response could not be parsed
+        """
+        for i in range(0, len(keys), chunk_size):
+            keys_chunk = keys[i:i + chunk_size]
+            payload = {"all_tpkds": "true", "gamekeys": keys_chunk}
+            response = self._request("GET", HumbleApi.ORDERS_URL, params=payload, endpoint="orders")
+            data_chunk = self.__parse_data(response)
+
+            chunk_games = []
+            for order in data_chunk.values():
+                parent = order["product"].get("human_name", None)
+                for tpk in order["tpkd_dict"]["all_tpks"]:
+                    if not GameRecord.is_claimed(tpk):
+                        chunk_games.append(GameRecord.from_tpk(tpk, parent))
+            yield keys_chunk, chunk_games
+
+
+    def _request(self, method, url, *args, endpoint: str = None, **kwargs):
         """
             Set sane defaults that aren't session wide. Otherwise maintains the API of Session.request.
 
+            GET requests naming an endpoint are served from the response cache when one is configured. Only successful
+            responses are stored.
+
+            :param str method: The HTTP method.
+            :param str url: The URL to request.
             :param list args: (optional) Extra positional args to pass to the request.
+            :param str endpoint: (optional) The cache endpoint name, which selects the TTL for the response.
             :param dict kwargs: (optional) Extra keyword args to pass to the request.
         """
         kwargs.setdefault("timeout", 30)
-        return self.session.request(*args, **kwargs)
+        if self.cache is None or endpoint is None or method != "GET":
+            return self.session.request(method, url, *args, **kwargs)
+
+        live_response = None
+
+        def request():
+            nonlocal live_response
+            live_response = self.session.request(method, url, *args, **kwargs)
+            return live_response.content, live_response.status_code == 200
+
+        content = self.cache.fetch(endpoint, url, kwargs.get("params"), request)
+        if live_response is not None:
+            return live_response
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.encoding = "utf-8"
+        response._content = content
+        return response
 
     def __authenticated_response_helper(self, response, data):
         """
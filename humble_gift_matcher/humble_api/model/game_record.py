@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+class GameRecord(object):
+    """
+        A lightweight view of a single game key from an order. It does not keep the raw order JSON around, only what
+        is needed to match the key against Steam wishlists.
+    """
+
+    __slots__ = ("name", "steam_app_id", "parent")
+
+    def __init__(self, name: str, steam_app_id: int = None, parent: str = None):
+        """
+            Parameterized constructor for the GameRecord object.
+
+            :param name: The human readable name of the game.
+            :param steam_app_id: (optional) The Steam appid, if known.
+            :param parent: (optional) The name of the product the key came from.
+        """
+        self.name = name
+        self.steam_app_id = steam_app_id
+        self.parent = parent
+
+    @classmethod
+    def from_tpk(cls, data, parent: str = None):
+        """
+            Builds a GameRecord from a key entry of an order's tpkd_dict.
+
+            :param data: The JSON data of the key.
+            :param parent: (optional) The name of the product the key came from.
+        """
+        return cls(data.get("human_name", None), data.get("steam_app_id", None), parent)
+
+    @staticmethod
+    def is_claimed(data) -> bool:
+        """
+            Whether a key entry of an order's tpkd_dict has already been redeemed.
+
+            :param data: The JSON data of the key.
+        """
+        return "redeemed_key_val" in data
+
+    def __repr__(self):
+        """ Representation of a GameRecord object. """
+        return "GameRecord: <%s>" % self.name
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+
+
+def appid_array(appids: Iterable[int]) -> np.ndarray:
+    """
+        Packs appids into a sorted, de-duplicated integer array, dropping missing and skipped (-1) appids.
+
+        :param appids: The appids to pack.
+        :return: A sorted int64 array of unique appids.
+    """
+    return np.unique(np.fromiter((appid for appid in appids if appid is not None and appid > 0), dtype=np.int64))
+
+
+def match_wishlists(available: np.ndarray,
+                    wishlists: Dict[str, Iterable[int]]) -> Tuple[Dict[str, List[int]], Dict[int, int]]:
+    """
+        Intersects every wishlist with the available appids and counts how many wishlists want each appid.
+
+        :param available: The available appids, as returned by appid_array.
+        :param wishlists: The wishlisted appids of each friend, keyed by steamid.
+        :return: A tuple of the matched appids for each friend, in wishlist order, and the number of friends
+         wishing for each available appid.
+    """
+    matches = {}
+    positions = []
+    for steamid, wishlist in wishlists.items():
+        wanted = np.fromiter(wishlist, dtype=np.int64)
+        matched = wanted[np.isin(wanted, available, assume_unique=True)]
+        matches[steamid] = matched.tolist()
+        positions.append(np.searchsorted(available, matched))
+
+    if positions:
+        counts = np.bincount(np.concatenate(positions), minlength=len(available))
+    else:
+        counts = np.zeros(len(available), dtype=np.int64)
+    return matches, dict(zip(available.tolist(), counts.tolist()))
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Callable, Dict, Optional, Tuple
+
+
+class ResponseCacheMiss(Exception):
+    """ A response was requested in cache-only mode but no fresh copy was stored. """
+    pass
+
+
+class ResponseCache(object):
+    """
+        A small on-disk cache for HTTP response bodies shared by the Humble and Steam API wrappers.
+
+        Every entry belongs to a named endpoint, and each endpoint has its own time-to-live in seconds. A TTL of 0
+        means responses for that endpoint are never cached, and a single response may ask to be kept for less than
+        its endpoint's TTL. Bodies are stored zlib-compressed, prefixed by the time they were fetched and that
+        maximum age. The total size of the cache directory is capped; when a new entry pushes it over the cap
+        the least recently used entries are evicted. The cache may be shared between threads.
+    """
+
+    MODE_NORMAL = "normal"
+    MODE_NO_CACHE = "no-cache"
+    MODE_CACHE_ONLY = "cache-only"
+
+    # Default freshness, in seconds, for each endpoint.
+    DEFAULT_TTLS = {
+        "appids": 24 * 60 * 60,
+        "player_summaries": 60 * 60,
+        "wishlist": 6 * 60 * 60,
+        "wishlist_unavailable": 60 * 60,
+        "order_list": 0,
+        "orders": 60 * 60,
+        "app_prices": 24 * 60 * 60,
+    }
+
+    _HEADER = struct.Struct("<dd")
+    _SUFFIX = ".z"
+
+    def __init__(self, directory: str, max_bytes: int, ttls: Dict[str, int] = None, mode: str = MODE_NORMAL):
+        """
+            Parameterized constructor for the ResponseCache object.
+
+            :param directory: The directory entries are stored in. Created if it doesn't exist.
+            :param max_bytes: The maximum combined size of all entries on disk.
+            :param ttls: (optional) Per-endpoint TTL overrides, merged over DEFAULT_TTLS.
+            :param mode: One of MODE_NORMAL, MODE_NO_CACHE or MODE_CACHE_ONLY.
+        """
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        self.ttls = dict(ResponseCache.DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.mode = mode
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        # path -> (size, last used), used to enforce the size cap without rescanning the directory.
+        self._entries: Dict[str, Tuple[int, float]] = {}
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(ResponseCache._SUFFIX):
+                stat = entry.stat()
+                self._entries[entry.path] = (stat.st_size, stat.st_mtime)
+        self._total_bytes = sum(size for size, _ in self._entries.values())
+
+    def fetch(self, endpoint: str, url: str, params, request: Callable[[], Tuple[bytes, bool]]) -> bytes:
+        """
+            Returns the body for a request, from the cache if a fresh copy exists, otherwise by performing it.
+
+            :param endpoint: The name of the endpoint, used to select the TTL.
+            :param url: The URL of the request.
+            :param params: The querystring parameters of the request, or None.
+            :param request: Performs the request and returns a tuple of the body and either whether it may be cached
+             or, for responses that should expire sooner than the endpoint's TTL, the maximum age in seconds.
+            :return: The response body.
+            :raises ResponseCacheMiss: In cache-only mode, when no fresh copy is stored.
+        """
+        ttl = self.ttls.get(endpoint, 0)
+        if self.mode == ResponseCache.MODE_NO_CACHE or ttl <= 0:
+            return request()[0]
+
+        path = self._path(endpoint, url, params)
+        content = self.load(path, ttl)
+        if content is not None:
+            return content
+        if self.mode == ResponseCache.MODE_CACHE_ONLY:
+            raise ResponseCacheMiss(f"No cached response for {url}")
+
+        content, cacheable = request()
+        if cacheable is True:
+            self.store(path, content)
+        elif cacheable is not False and cacheable > 0:
+            self.store(path, content, cacheable)
+        return content
+
+    def lookup(self, endpoint: str, url: str, params) -> Optional[bytes]:
+        """
+            Returns a fresh stored body without performing the request, for callers that fetch in batches.
+
+            :param endpoint: The name of the endpoint, used to select the TTL.
+            :param url: The URL of the request.
+            :param params: The querystring parameters of the request, or None.
+            :return: The stored body, or None if there is no fresh copy or caching is disabled.
+        """
+        ttl = self.ttls.get(endpoint, 0)
+        if self.mode == ResponseCache.MODE_NO_CACHE or ttl <= 0:
+            return None
+        return self.load(self._path(endpoint, url, params), ttl)
+
+    def remember(self, endpoint: str, url: str, params, content: bytes):
+        """
+            Stores a body fetched outside of fetch, such as one entry of a batched response.
+
+            :param endpoint: The name of the endpoint, used to select the TTL.
+            :param url: The URL of the request.
+            :param params: The querystring parameters of the request, or None.
+            :param content: The body to store.
+            :return: None
+        """
+        if self.mode == ResponseCache.MODE_NO_CACHE or self.ttls.get(endpoint, 0) <= 0:
+            return
+        self.store(self._path(endpoint, url, params), content)
+
+    def load(self, path: str, ttl: int) -> Optional[bytes]:
+        """
+            Reads an entry if it exists and is younger than ttl seconds.
+
+            :param path: The path of the entry.
+            :param ttl: The maximum age of the entry, in seconds.
+            :return: The decompressed body, or None if absent or stale.
+        """
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+            fetched_at, max_age = ResponseCache._HEADER.unpack_from(raw)
+            expired = time.time() - fetched_at > min(ttl, max_age)
+            content = None if expired else zlib.decompress(raw[ResponseCache._HEADER.size:])
+        except (OSError, struct.error, zlib.error):
+            expired, content = False, None
+
+        if content is None:
+            with self._lock:
+                self.stats["expired"] += expired
+                self.stats["misses"] += 1
+            return None
+
+        # Touch the entry so eviction treats it as recently used.
+        now = time.time()
+        with self._lock:
+            if path in self._entries:
+                os.utime(path, (now, now))
+                self._entries[path] = (len(raw), now)
+            self.stats["hits"] += 1
+        return content
+
+    def store(self, path: str, content: bytes, max_age: float = float("inf")):
+        """
+            Writes an entry, then evicts least recently used entries until the cache is under its size cap.
+
+            :param path: The path of the entry.
+            :param content: The response body.
+            :param max_age: (optional) Expire the entry after this many seconds even if the endpoint's TTL is longer.
+            :return: None
+        """
+        now = time.time()
+        raw = ResponseCache._HEADER.pack(now, max_age) + zlib.compress(content)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(raw)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            previous_size, _ = self._entries.get(path, (0, 0))
+            self._entries[path] = (len(raw), now)
+            self._total_bytes += len(raw) - previous_size
+            self.stats["stores"] += 1
+            self._evict()
+
+    def clear(self):
+        """
+            Removes every entry from the cache.
+
+            :return: None
+        """
+        with self._lock:
+            for path in list(self._entries):
+                self._remove(path)
+
+    def summary(self) -> str:
+        """ A one line description of the cache statistics for this run. """
+        return (f"{self.stats['hits']} hits, {self.stats['misses']} misses ({self.stats['expired']} expired), "
+                f"{self.stats['stores']} stored, {self.stats['evictions']} evicted, "
+                f"{len(self._entries)} entries using {self._total_bytes / (1024 * 1024):.1f} MiB")
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        for path, _ in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._remove(path)
+            self.stats["evictions"] += 1
+
+    def _remove(self, path: str):
+        size, _ = self._entries.pop(path)
+        self._total_bytes -= size
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _path(self, endpoint: str, url: str, params) -> str:
+        key = json.dumps([url, params], sort_keys=True, default=str)
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{endpoint}-{digest}{ResponseCache._SUFFIX}")
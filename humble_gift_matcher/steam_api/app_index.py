@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable
+import numpy as np
+
+
+class AppIndex(object):
+    """
+        A read-only, memory-mapped index from Steam app names to appids.
+
+        The file holds the app names sorted by their UTF-8 bytes, an offset table into the name blob and the appid of
+        each name. Opening it only maps the file; lookups binary search the mapped names and the offset and appid
+        tables are NumPy views over the mapping, so nothing is parsed up front and concurrent processes share the
+        same pages.
+
+        Layout (little endian, tables 8 byte aligned):
+            header          magic, count
+            offsets         uint64[count + 1], into the name blob
+            appids          uint32[count], padded to 8 bytes
+            name blob       app names, UTF-8
+    """
+
+    MAGIC = b"HGMAPPS2"
+    _HEADER = struct.Struct("<8sQ")
+
+    def __init__(self, path: str):
+        """
+            Parameterized constructor for the AppIndex object.
+
+            :param path: The index file, as written by AppIndex.build.
+            :raises ValueError: If the file is not an app index in the current format.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count = AppIndex._HEADER.unpack_from(self._mmap)
+        if magic != AppIndex.MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not an app index")
+
+        offset = AppIndex._HEADER.size
+        self._offsets = np.frombuffer(self._mmap, dtype="<u8", count=count + 1, offset=offset)
+        offset += 8 * (count + 1)
+        self._appids = np.frombuffer(self._mmap, dtype="<u4", count=count, offset=offset)
+        offset += _aligned(4 * count)
+        self._name_base = offset
+        self._count = count
+        self.names = _NameList(self)
+
+    @staticmethod
+    def build(apps: Iterable[Dict[str, Any]], path: str):
+        """
+            Writes an index for the given apps. Names are matched exactly, as with a plain dict; when several apps
+            share a name the last one wins.
+
+            :param apps: The apps, as returned by get_appids.
+            :param path: The file to write the index to. Replaced atomically.
+            :return: None
+        """
+        entries = {}
+        for app in apps:
+            if app["name"]:
+                entries[app["name"].encode("utf-8")] = app["appid"]
+        names = sorted(entries)
+        count = len(names)
+
+        offsets = np.zeros(count + 1, dtype="<u8")
+        np.cumsum([len(name) for name in names], out=offsets[1:])
+        appids = np.array([entries[name] for name in names], dtype="<u4")
+
+        # A temporary file of our own, so concurrent runs rebuilding the index don't truncate each other's output.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                        prefix=os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(AppIndex._HEADER.pack(AppIndex.MAGIC, count))
+                f.write(offsets.tobytes())
+                f.write(appids.tobytes())
+                f.write(b"\0" * (_aligned(4 * count) - 4 * count))
+                f.write(b"".join(names))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def get(self, name: str, default=None):
+        """
+            Looks up the appid of an app by its exact name.
+
+            :param name: The app name.
+            :param default: (optional) Returned when the name isn't in the index.
+            :return: The appid, or default.
+        """
+        if not name:
+            return default
+        key = name.encode("utf-8")
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            if self._raw_name(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low < self._count and self._raw_name(low) == key:
+            return int(self._appids[low])
+        return default
+
+    def close(self):
+        """ Unmaps the index file. """
+        self.names = None
+        self._offsets = self._appids = None
+        self._mmap.close()
+
+    def __len__(self):
+        return self._count
+
+    def _raw_name(self, i: int) -> bytes:
+        return self._mmap[self._name_base + int(self._offsets[i]):self._name_base + int(self._offsets[i + 1])]
+
+    def _name(self, i: int) -> str:
+        return self._raw_name(i).decode("utf-8")
+
+
+class _NameList(Sequence):
+    """ The names of an AppIndex, decoded on access so they can be handed straight to the fuzzy matcher. """
+
+    def __init__(self, index: AppIndex):
+        self._index = index
+
+    def __len__(self):
+        return len(self._index)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._index._name(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._index._name(i)
+
+
+def _aligned(size: int) -> int:
+    return (size + 7) & ~7
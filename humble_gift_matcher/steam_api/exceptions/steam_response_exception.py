@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import requests
+
+
+class SteamResponseException(requests.RequestException):
+    """ A request to Steam completed but the response was an error that retrying won't fix. """
+    pass
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from .steam_response_exception import SteamResponseException
+
+
+class SteamThrottledException(SteamResponseException):
+    """ Steam refused or failed a request in a way that is worth retrying later, most often rate limiting. """
+
+    def __init__(self, *args, retry_after: float = None, **kwargs):
+        """
+            Parameterized constructor for SteamThrottledException.
+
+            :param list args: (optional) Extra positional args to pass to the request.
+            :param float retry_after: (optional) How long Steam asked us to wait, in seconds.
+            :param dict kwargs: (optional) Extra keyword args to pass to the request.
+        """
+        super(SteamThrottledException, self).__init__(*args, **kwargs)
+        self.retry_after = retry_after
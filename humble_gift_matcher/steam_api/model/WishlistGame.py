@@ -17,6 +17,7 @@ class WishlistGame(BaseModel):
         super(WishlistGame, self).__init__(data)
 
         self.name = data.get("name", None)
+        self.type = data.get("type", None)
         self.reviews_percent = data.get("reviews_percent", None)
 
         subs = data.get("subs", None)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import threading
+import time
+from typing import Dict
+
+
+class _HostState(object):
+    """ The congestion state of a single host. """
+
+    def __init__(self, limit: float):
+        self.limit = limit
+        self.in_flight = 0
+        self.latency = None
+        self.backoff_until = 0.0
+        self.last_decrease = float("-inf")
+        self.consecutive_throttles = 0
+        self.stats = {"ok": 0, "throttled": 0, "errors": 0}
+
+
+class AdaptiveRateController(object):
+    """
+        Limits the number of requests in flight to each host and adapts the limit to how the host responds.
+
+        The limit follows AIMD: every successful response grows it by increase / limit (roughly +increase per round
+        trip at full concurrency), while a throttled response multiplies it by decrease and makes every caller wait
+        out a backoff, either the host's Retry-After or an exponentially growing delay. Successes whose latency is
+        well above the running average don't grow the limit, so we stop ramping up before the host starts refusing.
+        Errors are counted and shrink the limit like throttling does, without the backoff.
+
+        A burst of throttles or errors is one congestion event: the limit is decreased and the backoff stepped once,
+        and responses to requests sent before that decrease, successful or not, are only counted.
+    """
+
+    def __init__(self, initial: float = 4, minimum: float = 1, maximum: float = 16, increase: float = 1.0,
+                 decrease: float = 0.5, base_backoff: float = 2.0, max_backoff: float = 60.0):
+        """
+            Parameterized constructor for the AdaptiveRateController object.
+
+            :param initial: (optional) The starting in-flight limit of each host.
+            :param minimum: (optional) The lowest the limit may shrink to.
+            :param maximum: (optional) The highest the limit may grow to.
+            :param increase: (optional) The additive increase per round trip.
+            :param decrease: (optional) The multiplicative decrease on throttling or errors.
+            :param base_backoff: (optional) The first backoff, in seconds, when no Retry-After is given.
+            :param max_backoff: (optional) The longest backoff, in seconds.
+        """
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._hosts: Dict[str, _HostState] = {}
+        self._condition = threading.Condition()
+
+    def acquire(self, host: str) -> float:
+        """
+            Blocks until a request to host may be sent.
+
+            :param host: The host the request is for.
+            :return: The time the request was admitted, to be passed back to release.
+        """
+        with self._condition:
+            state = self._state(host)
+            while True:
+                wait = state.backoff_until - time.monotonic()
+                if wait <= 0 and state.in_flight < max(int(state.limit), 1):
+                    break
+                self._condition.wait(wait if wait > 0 else None)
+            state.in_flight += 1
+            return time.monotonic()
+
+    def release(self, host: str, started: float, throttled: bool = False, failed: bool = False,
+                retry_after: float = None):
+        """
+            Records the outcome of a request admitted by acquire and adapts the limit of its host.
+
+            :param host: The host the request was for.
+            :param started: The value returned by acquire.
+            :param throttled: (optional) True if the host throttled the request.
+            :param failed: (optional) True if the request failed for any other reason.
+            :param retry_after: (optional) How long the host asked us to wait, in seconds.
+            :return: None
+        """
+        latency = time.monotonic() - started
+        with self._condition:
+            state = self._state(host)
+            state.in_flight -= 1
+            # Requests sent before the last decrease were part of the congestion it already reacted to.
+            new_event = started >= state.last_decrease
+            if throttled:
+                state.stats["throttled"] += 1
+                if new_event:
+                    state.consecutive_throttles += 1
+                    state.limit = max(self.minimum, state.limit * self.decrease)
+                    state.last_decrease = time.monotonic()
+                    if retry_after is None:
+                        retry_after = min(self.max_backoff,
+                                          self.base_backoff * 2 ** (state.consecutive_throttles - 1))
+                if retry_after is not None:
+                    state.backoff_until = max(state.backoff_until, time.monotonic() + retry_after)
+            elif failed:
+                state.stats["errors"] += 1
+                if new_event:
+                    state.limit = max(self.minimum, state.limit * self.decrease)
+                    state.last_decrease = time.monotonic()
+            else:
+                state.stats["ok"] += 1
+                if new_event:
+                    state.consecutive_throttles = 0
+                if new_event and (state.latency is None or latency <= 2 * state.latency):
+                    state.limit = min(self.maximum, state.limit + self.increase / state.limit)
+                state.latency = latency if state.latency is None else 0.8 * state.latency + 0.2 * latency
+            self._condition.notify_all()
+
+    def summary(self) -> str:
+        """ A one line description of each host's final limit and outcomes. """
+        with self._condition:
+            return "; ".join(
+                f"{host}: limit {state.limit:.1f}, {state.stats['ok']} ok, {state.stats['throttled']} throttled, "
+                f"{state.stats['errors']} errors" + ("" if state.latency is None else f", {state.latency:.2f}s avg")
+                for host, state in self._hosts.items())
+
+    def _state(self, host: str) -> _HostState:
+        if host not in self._hosts:
+            self._hosts[host] = _HostState(self.initial)
+        return self._hosts[host]
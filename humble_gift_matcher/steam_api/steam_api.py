@@ -1,9 +1,76 @@
 import requests
 import json
-from typing import List, Dict, Any
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Dict, Any, Optional, Tuple
 import urllib3
+from .exceptions.steam_response_exception import SteamResponseException
+from .exceptions.steam_throttled_exception import SteamThrottledException
 from .model.friend import Friend
 from .model.WishlistGame import WishlistGame
+from .rate_controller import AdaptiveRateController
+from ..response_cache import ResponseCache, ResponseCacheMiss
+
+STORE_HOST = "store.steampowered.com"
+THROTTLED = "throttled"
+FAILED = "failed"
+
+def _cached_get(endpoint: str, url: str, params: Dict[str, Any], cache: ResponseCache,
+                request: Callable[[], Tuple[bytes, bool]]) -> bytes:
+    if cache is None:
+        return request()[0]
+    return cache.fetch(endpoint, url, params, request)
+
+def _parse(content: bytes):
+    try:
+        return json.loads(content)
+    except json.decoder.JSONDecodeError:
+        print(
+            f"[Error] Steam API response invalid. Expected data, recieved:\n{content[:500]!r}. \nCheck your config.")
+        raise
+
+def _retry_after(api_response: requests.Response) -> Optional[float]:
+    value = api_response.headers.get("Retry-After", "")
+    return float(value) if value.isdigit() else None
+
+def _response_outcome(api_response: requests.Response) -> Optional[str]:
+    # Only a 429, a 5xx or a 200 with a null body mean the store is throttling us. Any other error status, or a body
+    # that isn't JSON such as an error page or the login page once the session expires, won't improve with retries.
+    if api_response.status_code == 429 or api_response.status_code >= 500:
+        return THROTTLED
+    if api_response.status_code >= 400:
+        return FAILED
+    try:
+        data = api_response.json()
+    except ValueError:
+        return FAILED
+    if data is None:
+        return THROTTLED if api_response.status_code == 200 else FAILED
+    return None
+
+def _store_get(url: str, params: Dict[str, Any], session: requests.Session, controller: AdaptiveRateController,
+               outcome: Callable[[requests.Response], Optional[str]] = _response_outcome) -> requests.Response:
+    if controller is not None:
+        started = controller.acquire(STORE_HOST)
+    try:
+        api_response = requests.get(url, params=params) if session is None else session.get(url, params=params)
+    except requests.RequestException:
+        if controller is not None:
+            controller.release(STORE_HOST, started, failed=True)
+        raise
+
+    result = outcome(api_response)
+    if controller is not None:
+        controller.release(STORE_HOST, started, throttled=result == THROTTLED, failed=result == FAILED,
+                           retry_after=_retry_after(api_response))
+    if result == THROTTLED:
+        raise SteamThrottledException(f"Steam throttled the request for {url} (HTTP {api_response.status_code})",
+                                      retry_after=_retry_after(api_response), response=api_response)
+    if result == FAILED:
+        raise SteamResponseException(f"Steam rejected the request for {url} (HTTP {api_response.status_code})",
+                                     response=api_response)
+    return api_response
 
 def get_friends(api_key: str, user_id: int):
     url = "http://api.steampowered.com/ISteamUser/GetFriendList/v0001"
@@ -17,47 +84,156 @@ def get_friends(api_key: str, user_id: int):
             f"[Error] Steam API response invalid. Expected data, recieved:\n{api_response.text}. \nCheck your config.")
     return friends
 
-def get_friends_with_details(api_key: str, user_id: int, friend_ids: List[str] = None) -> Dict[str, Friend]:
+def get_friends_with_details(api_key: str, user_id: int, friend_ids: List[str] = None,
+                             cache: ResponseCache = None) -> Dict[str, Friend]:
     friend_ids = [friend["steamid"] for friend in get_friends(api_key, user_id)] if friend_ids is None else friend_ids
     url = "http://api.steampowered.com/ISteamUser/GetPlayerSummaries/v0002"
     payload = {'key': api_key, 'steamids':  ','.join(friend_ids)}
 
-    api_response = requests.get(url, params=payload)
-    try:
-        json = api_response.json()["response"]["players"]
-    except json.decoder.JSONDecodeError:
-        print(
-            f"[Error] Steam API response invalid. Expected data, recieved:\n{api_response.text}. \nCheck your config.")
-    friends = dict([(friend["steamid"], Friend(friend)) for friend in json])
+    def request():
+        api_response = requests.get(url, params=payload)
+        return api_response.content, api_response.status_code == 200
+
+    players = _parse(_cached_get("player_summaries", url, payload, cache, request))["response"]["players"]
+    friends = dict([(friend["steamid"], Friend(friend)) for friend in players])
     return friends
 
-def get_wishlist(user_id: int, session: requests.Session = None) -> Dict[int, WishlistGame]:
+def _wishlist_outcome(api_response: requests.Response) -> Optional[str]:
+    result = _response_outcome(api_response)
+    if result is not None:
+        return result
+    # An empty wishlist is an empty list and a private one is {"success": 2}; any other status is an error.
+    data = api_response.json()
+    if type(data) is dict and 'success' in data:
+        return None if data['success'] == 2 else FAILED
+    return None if type(data) in (dict, list) else FAILED
+
+def get_wishlist(user_id: int, session: requests.Session = None, cache: ResponseCache = None,
+                 controller: AdaptiveRateController = None) -> Dict[int, WishlistGame]:
+    # Empty and private wishlists come back as {}; a throttled request raises SteamThrottledException and any other
+    # error SteamResponseException instead, since then the wishlist is unknown rather than empty.
     url = f"https://store.steampowered.com/wishlist/profiles/{user_id}/wishlistdata/?p=0"
 
-    if session is None:
-        api_response = requests.get(url)
-    else:
-        api_response = session.get(url)
-    try:
-        json = api_response.json()
-    except json.decoder.JSONDecodeError:
-        print(
-            f"[Error] Steam API response invalid. Expected data, recieved:\n{api_response.text}. \nCheck your config.")
-        
-    if type(json) is not dict or 'success' in json:
+    def request():
+        api_response = _store_get(url, None, session, controller, _wishlist_outcome)
+        data = api_response.json()
+        if type(data) is dict and 'success' not in data:
+            return api_response.content, True
+        # Empty and private wishlists are kept for a shorter time, as a profile may be made public at any time.
+        return api_response.content, False if cache is None else cache.ttls.get("wishlist_unavailable", 0)
+
+    data = _parse(_cached_get("wishlist", url, None, cache, request))
+    if type(data) is not dict or 'success' in data:
         return {}
-    wishlist = dict([(int(id), WishlistGame(game)) for id, game in json.items()])
+    wishlist = dict([(int(id), WishlistGame(game)) for id, game in data.items()])
     return wishlist
 
-def get_appids() -> List[Dict[str, Any]]:
+def get_appids(cache: ResponseCache = None) -> List[Dict[str, Any]]:
     url = "https://api.steampowered.com/ISteamApps/GetAppList/v2"
 
-    # requests doesn't return the full list for some reason
-    urlresp = urllib3.request("GET", url)
+    def request():
+        # requests doesn't return the full list for some reason
+        urlresp = urllib3.request("GET", url)
+        return urlresp.data, urlresp.status == 200
+
+    return _parse(_cached_get("appids", url, None, cache, request))["applist"]["apps"]
+
+def fetch_wishlists(user_ids: Iterable[str], session: requests.Session = None, cache: ResponseCache = None,
+                    controller: AdaptiveRateController = None,
+                    max_attempts: int = 8) -> Iterator[Tuple[str, Optional[Dict[int, WishlistGame]]]]:
+    # Yields (user id, wishlist) in completion order, as fast as the controller allows. Throttled requests go back on
+    # the queue and are retried once the backoff has passed. A wishlist still throttled after max_attempts, rejected
+    # outright, or missing from the cache in cache-only mode is None.
+    controller = AdaptiveRateController() if controller is None else controller
+    user_ids = list(user_ids)
+    pending = queue.Queue()
+    results = queue.Queue()
+    for user_id in user_ids:
+        pending.put((user_id, 1))
+
+    def worker():
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            user_id, attempt = item
+            try:
+                results.put((user_id, get_wishlist(user_id, session, cache, controller)))
+            except (SteamThrottledException, requests.ConnectionError, requests.Timeout):
+                if attempt < max_attempts:
+                    pending.put((user_id, attempt + 1))
+                else:
+                    results.put((user_id, None))
+            except requests.RequestException:
+                # Not something a retry would fix, such as a 403 or an expired session.
+                results.put((user_id, None))
+            except ResponseCacheMiss:
+                # Only happens in cache-only mode; the wishlist is reported as unavailable rather than ending the run.
+                results.put((user_id, None))
+            except Exception as e:
+                results.put((user_id, e))
+
+    workers = [threading.Thread(target=worker, daemon=True) for _ in range(int(controller.maximum))]
+    for thread in workers:
+        thread.start()
     try:
-        json = urlresp.json()
-    except json.decoder.JSONDecodeError:
-        print(
-            f"[Error] Steam API response invalid. Expected data, recieved:\n{urlresp}. \nCheck your config.")
+        for _ in user_ids:
+            user_id, wishlist = results.get()
+            if isinstance(wishlist, Exception):
+                raise wishlist
+            yield user_id, wishlist
+    finally:
+        for _ in workers:
+            pending.put(None)
+
+def get_app_prices(appids: Iterable[int], cache: ResponseCache = None, max_workers: int = 4,
+                   price_batch_size: int = 100, controller: AdaptiveRateController = None,
+                   max_attempts: int = 4) -> Dict[int, Dict[str, Any]]:
+    # App types come with the wishlists, so appdetails is only needed for prices, which it serves for many appids per
+    # request. Each appid's entry is cached on its own, so a change to the set of matched apps doesn't invalidate
+    # every batch after it.
+    url = "https://store.steampowered.com/api/appdetails"
+    appids = sorted(set(appids))
+
+    def price_params(appid: int):
+        return {'appids': appid, 'filters': 'price_overview'}
+
+    def get_batch(session: requests.Session, batch: List[int]):
+        payload = {'appids': ','.join(map(str, batch)), 'filters': 'price_overview'}
+        # Throttled responses raise; the controller holds the retry back until its backoff has passed.
+        for attempt in range(1, max_attempts + 1):
+            try:
+                data = _store_get(url, payload, session, controller).json()
+                break
+            except SteamThrottledException:
+                if attempt == max_attempts:
+                    return {}
+            except requests.RequestException:
+                return {}
+        entries = {}
+        for appid in batch:
+            entry = data.get(str(appid)) if type(data) is dict else None
+            if type(entry) is dict:
+                entries[appid] = entry
+                if cache is not None:
+                    cache.remember("app_prices", url, price_params(appid), json.dumps(entry).encode("utf-8"))
+        return entries
+
+    entries = {}
+    uncached = []
+    for appid in appids:
+        content = None if cache is None else cache.lookup("app_prices", url, price_params(appid))
+        if content is None:
+            uncached.append(appid)
+        else:
+            entries[appid] = json.loads(content)
+    if cache is not None and cache.mode == ResponseCache.MODE_CACHE_ONLY:
+        uncached = []
+
+    batches = [uncached[i:i + price_batch_size] for i in range(0, len(uncached), price_batch_size)]
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for batch_entries in executor.map(lambda batch: get_batch(session, batch), batches):
+            entries.update(batch_entries)
 
-    return json["applist"]["apps"]
\ No newline at end of file
+    return dict([(appid, entry["data"]["price_overview"]) for appid, entry in entries.items()
+                 if entry.get("success") and type(entry.get("data")) is dict and entry["data"].get("price_overview")])